@@ -5,35 +5,211 @@ A simple Flask application that provides webhook endpoints for receiving
 HTTP POST requests from external services.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
+from flask_orjson import OrjsonProvider
+from a2wsgi import WSGIMiddleware
+import hashlib
+import hmac
 import logging
-import json
+import logging.handlers
+import atexit
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import count
+import orjson
 from datetime import datetime
 import os
 
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of reporting an error"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Under overload, shed log records rather than block or print a traceback
+            self.dropped += 1
+
+
+def configure_logging():
+    """
+    Route root logging through a QueueHandler; a background QueueListener does
+    the blocking stderr/file writes so request threads only enqueue records.
+
+    Safe to call more than once: Uvicorn's spawned workers import this file both
+    as __mp_main__ and as app, and the second call must not add another handler.
+    """
+    root_logger = logging.getLogger()
+    if any(isinstance(h, logging.handlers.QueueHandler) for h in root_logger.handlers):
+        return
+    
+    log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    log_handlers = [logging.StreamHandler()]
+    if os.environ.get('LOG_FILE'):
+        log_handlers.append(logging.FileHandler(os.environ['LOG_FILE']))
+    for handler in log_handlers:
+        handler.setFormatter(log_formatter)
+    
+    log_queue = queue.Queue(maxsize=10000)
+    root_logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    root_logger.addHandler(_DroppingQueueHandler(log_queue))
+    
+    queue_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+    queue_listener.start()
+    # Flush any queued records before the process exits
+    atexit.register(queue_listener.stop)
+
+
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+
+class _LazyJson:
+    """Defer pretty-printing a payload until a log record is actually emitted"""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return orjson.dumps(self.data, option=orjson.OPT_INDENT_2).decode()
+
+
+class _Headers:
+    """Defer rendering request headers until a log record is actually emitted"""
+
+    __slots__ = ('headers',)
+
+    def __init__(self, headers):
+        self.headers = headers
+
+    def __str__(self):
+        return "; ".join(f"{key}={value}" for key, value in self.headers.items())
+
+
+class _RateLimitFilter(logging.Filter):
+    """Drop records below WARNING once more than `rate` were logged in the last second"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self._stamps = deque()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            while self._stamps and now - self._stamps[0] >= 1.0:
+                self._stamps.popleft()
+            if len(self._stamps) >= self.rate:
+                return False
+            self._stamps.append(now)
+        return True
+
+
+class _DuplicateFilter(logging.Filter):
+    """Suppress records below WARNING whose rendered message was already seen within `window` seconds"""
+
+    def __init__(self, window=5.0, maxsize=1024):
+        super().__init__()
+        self.window = window
+        self.maxsize = maxsize
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        # Render the message once and freeze it on the record (as QueueHandler.prepare
+        # would), so the lazy args are formatted a single time and never kept alive here.
+        # Only a small digest of the text is cached.
+        message = record.getMessage()
+        record.msg, record.args = message, None
+        key = (record.levelno, hashlib.blake2b(message.encode(), digest_size=16).digest())
+        now = time.monotonic()
+        with self._lock:
+            last = self._seen.get(key)
+            if last is not None and now - last < self.window:
+                return False
+            self._seen[key] = now
+            self._seen.move_to_end(key)
+            if len(self._seen) > self.maxsize:
+                self._seen.popitem(last=False)
+        return True
+
+
+class _DebugSampleFilter(logging.Filter):
+    """Keep only one in every `every` DEBUG records"""
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+        self._counter = count()
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG or self.every <= 1:
+            return True
+        return next(self._counter) % self.every == 0
+
+
+logger.addFilter(_DebugSampleFilter(int(os.environ.get('LOG_DEBUG_SAMPLE', 1))))
+# Rate limiting runs before de-duplication so dropped records are never formatted
+logger.addFilter(_RateLimitFilter(int(os.environ.get('LOG_RATE_LIMIT', 100))))
+logger.addFilter(_DuplicateFilter())
+
+
 # Create Flask application
 app = Flask(__name__)
 
+# Serialize responses with orjson; naive datetimes are emitted as UTC with a 'Z' suffix.
+# OPT_SORT_KEYS and OPT_INDENT_2 are deliberately left out: output stays compact and
+# in insertion order regardless of DEBUG, unlike Flask's default provider.
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+app.json = OrjsonProvider(app)
+app.json.option = ORJSON_OPTIONS
+
 # Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 app.config['DEBUG'] = os.environ.get('DEBUG', 'False').lower() == 'true'
+app.config['GITHUB_WEBHOOK_SECRET'] = os.environ.get('GITHUB_WEBHOOK_SECRET', '')
+
+
+def json_response(payload, status=200):
+    """Serialize payload straight to a JSON Response, skipping the jsonify wrapper"""
+    return Response(orjson.dumps(payload, option=ORJSON_OPTIONS), status=status, mimetype='application/json')
+
+
+# The health check body never changes, so serialize it once at import.
+# Bump HEALTH_ETAG whenever HEALTH_BODY changes.
+HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'message': 'Flask Webhook API is running'
+})
+HEALTH_ETAG = 'healthy-v1'
+HEALTH_HEADERS = {'ETag': f'"{HEALTH_ETAG}"', 'Cache-Control': 'public, max-age=1'}
+
+# Fixed leading bytes of every successful /webhook response; only the
+# timestamp and data are serialized per request
+WEBHOOK_OK_PREFIX = b'{"status":"success","message":"Webhook processed successfully","timestamp":'
 
 
 @app.route('/', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'message': 'Flask Webhook API is running',
-        'timestamp': datetime.utcnow().isoformat()
-    })
+    """Health check endpoint, answering 304 when the client already holds the current body"""
+    if request.if_none_match.contains_weak(HEALTH_ETAG):
+        return Response(status=304, headers=HEALTH_HEADERS)
+    return Response(HEALTH_BODY, mimetype='application/json', headers=HEALTH_HEADERS)
 
 
 @app.route('/webhook', methods=['POST'])
@@ -43,70 +219,87 @@ def webhook_handler():
     
     Accepts JSON payload and processes webhook data
     """
+    now = datetime.utcnow()
     try:
         # Get request data
         content_type = request.headers.get('Content-Type', '')
         
-        # Log incoming request
-        logger.info(f"Webhook received from IP: {request.remote_addr}")
-        logger.info(f"Content-Type: {content_type}")
-        logger.info(f"Headers: {dict(request.headers)}")
+        logger.debug("Headers: %s", _Headers(request.headers))
         
         # Parse JSON data
         if 'application/json' in content_type:
-            webhook_data = request.get_json()
+            raw = request.get_data(cache=False)
+            try:
+                webhook_data = orjson.loads(raw) if raw else None
+            except orjson.JSONDecodeError as e:
+                # Answer malformed bodies here rather than unwinding to the outer handler
+                logger.error("Invalid JSON in webhook payload from IP %s: %s", request.remote_addr, e)
+                return json_response({
+                    'status': 'error',
+                    'message': 'Invalid JSON format',
+                    'timestamp': now
+                }, 400)
         else:
-            # Handle form data or raw data
+            # Handle form data or raw data; the body is read first so the form parser
+            # can reuse it, and the parser only runs for form content types
+            raw = request.get_data()
+            raw_data = raw.decode('utf-8', 'replace')
+            ct = content_type.lower()
+            if ct.startswith('application/x-www-form-urlencoded') or ct.startswith('multipart/form-data'):
+                form_data = dict(request.form) or None
+            else:
+                form_data = None
             webhook_data = {
-                'raw_data': request.get_data(as_text=True),
-                'form_data': dict(request.form) if request.form else None
+                'raw_data': raw_data,
+                'form_data': form_data
             }
         
-        # Log the payload (be careful with sensitive data in production)
-        logger.info(f"Webhook payload: {json.dumps(webhook_data, indent=2)}")
+        # Log the request as a single record (be careful with sensitive data in production)
+        logger.info(
+            "Webhook received from IP: %s, Content-Type: %s, payload: %s",
+            request.remote_addr, content_type, _LazyJson(webhook_data)
+        )
         
         # Process the webhook data (customize this section based on your needs)
-        response_data = process_webhook_data(webhook_data)
+        response_data = process_webhook_data(
+            webhook_data, received_at=now, payload_size=len(raw)
+        )
         
         # Return success response
-        return jsonify({
-            'status': 'success',
-            'message': 'Webhook processed successfully',
-            'timestamp': datetime.utcnow().isoformat(),
-            'data': response_data
-        }), 200
-        
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in webhook payload: {e}")
-        return jsonify({
-            'status': 'error',
-            'message': 'Invalid JSON format',
-            'timestamp': datetime.utcnow().isoformat()
-        }), 400
+        body = (
+            WEBHOOK_OK_PREFIX
+            + orjson.dumps(now, option=ORJSON_OPTIONS)
+            + b',"data":'
+            + orjson.dumps(response_data, option=ORJSON_OPTIONS)
+            + b'}'
+        )
+        return Response(body, status=200, mimetype='application/json')
         
     except Exception as e:
-        logger.error(f"Error processing webhook: {e}")
-        return jsonify({
+        logger.error("Error processing webhook: %s", e)
+        return json_response({
             'status': 'error',
             'message': 'Internal server error',
-            'timestamp': datetime.utcnow().isoformat()
-        }), 500
+            'timestamp': now
+        }, 500)
 
 
-def process_webhook_data(data):
+def process_webhook_data(data, received_at=None, payload_size=None):
     """
     Process the webhook data based on your business logic
     
     Args:
         data (dict): The webhook payload data
+        received_at (datetime): When the request arrived, defaults to now (UTC)
+        payload_size (int): Size of the raw request body in bytes
         
     Returns:
         dict: Processed response data
     """
     # Example processing - customize based on your needs
     processed_data = {
-        'received_at': datetime.utcnow().isoformat(),
-        'payload_size': len(str(data)),
+        'received_at': received_at or datetime.utcnow(),
+        'payload_size': payload_size,
         'payload_type': type(data).__name__
     }
     
@@ -120,6 +313,37 @@ def process_webhook_data(data):
     return processed_data
 
 
+def _handle_github_push(event_type, data):
+    """Handle GitHub push events"""
+    logger.info("Processing push event")
+
+
+def _handle_github_pull_request(event_type, data):
+    """Handle GitHub pull request events"""
+    logger.info("Processing pull request event")
+
+
+def _handle_github_unknown(event_type, data):
+    """Fallback for GitHub events without a dedicated handler"""
+    logger.info("Unhandled GitHub event: %s", event_type)
+
+
+# GitHub event type -> handler, resolved with a single dict lookup per request
+_GITHUB_HANDLERS = {
+    'push': _handle_github_push,
+    'pull_request': _handle_github_pull_request,
+}
+
+
+def verify_github_signature(payload, signature, secret):
+    """Check an X-Hub-Signature-256 header against the HMAC-SHA256 of the raw body"""
+    if not signature:
+        return False
+    expected = 'sha256=' + hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
+    # Compare bytes: compare_digest rejects non-ASCII str, and Werkzeug decodes headers as latin-1
+    return hmac.compare_digest(expected.encode(), signature.encode('latin-1'))
+
+
 @app.route('/webhook/github', methods=['POST'])
 def github_webhook():
     """
@@ -127,45 +351,67 @@ def github_webhook():
     
     Handles GitHub webhook events with proper signature validation
     """
+    now = datetime.utcnow()
     try:
         # GitHub sends webhooks with specific headers
         event_type = request.headers.get('X-GitHub-Event')
         signature = request.headers.get('X-Hub-Signature-256')
+        raw = request.get_data(cache=False)
         
-        logger.info(f"GitHub webhook event: {event_type}")
+        # Reject forged deliveries before any parsing or logging of the payload
+        secret = app.config['GITHUB_WEBHOOK_SECRET']
+        if secret and not verify_github_signature(raw, signature, secret):
+            logger.warning("Invalid GitHub webhook signature from IP: %s", request.remote_addr)
+            return json_response({
+                'status': 'error',
+                'message': 'Invalid signature',
+                'timestamp': now
+            }, 401)
         
-        webhook_data = request.get_json()
+        logger.info("GitHub webhook event: %s", event_type)
+        
+        webhook_data = orjson.loads(raw) if raw else None
         
         # Process GitHub-specific events
-        if event_type == 'push':
-            logger.info("Processing push event")
-            # Handle push events
-        elif event_type == 'pull_request':
-            logger.info("Processing pull request event")
-            # Handle PR events
-        else:
-            logger.info(f"Unhandled GitHub event: {event_type}")
+        _GITHUB_HANDLERS.get(event_type, _handle_github_unknown)(event_type, webhook_data)
         
-        return jsonify({
+        return json_response({
             'status': 'success',
             'message': f'GitHub {event_type} event processed',
-            'timestamp': datetime.utcnow().isoformat()
-        }), 200
+            'timestamp': now
+        }, 200)
         
     except Exception as e:
-        logger.error(f"Error processing GitHub webhook: {e}")
-        return jsonify({
+        logger.error("Error processing GitHub webhook: %s", e)
+        return json_response({
             'status': 'error',
             'message': 'Failed to process GitHub webhook',
-            'timestamp': datetime.utcnow().isoformat()
-        }), 500
+            'timestamp': now
+        }, 500)
+
+
+# ASGI entry point for Uvicorn (or gunicorn with uvicorn.workers.UvicornWorker)
+asgi_app = WSGIMiddleware(app)
 
 
 if __name__ == '__main__':
+    import uvicorn
+
     # Get configuration from environment variables
     host = os.environ.get('HOST', '0.0.0.0')
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('DEBUG', 'False').lower() == 'true'
+    workers = 1 if debug else int(os.environ.get('WORKERS', 4))
     
-    logger.info(f"Starting Flask webhook API on {host}:{port}")
-    app.run(host=host, port=port, debug=debug)
\ No newline at end of file
+    logger.info("Starting Flask webhook API on %s:%s with %d worker(s)", host, port, workers)
+    # 'auto' picks uvloop and httptools when installed (uvicorn[standard]),
+    # falling back to asyncio/h11 on platforms without them (e.g. Windows)
+    uvicorn.run(
+        'app:asgi_app',
+        host=host,
+        port=port,
+        http='auto',
+        loop='auto',
+        workers=workers,
+        reload=debug
+    )
\ No newline at end of file
@@ -15,6 +15,7 @@ class Config:
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
     HOST = os.environ.get('HOST', '0.0.0.0')
     PORT = int(os.environ.get('PORT', 5000))
+    WORKERS = int(os.environ.get('WORKERS', 4))
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
 
 
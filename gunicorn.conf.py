@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for serving the Flask Webhook API over WSGI
+
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', 5000)}"
+
+# One process per core (plus one), each serving requests from a small thread pool
+workers = int(os.environ.get('WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('THREADS', 4))
+
+# Keep worker heartbeat files in memory instead of on disk where available
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# Hold idle connections open so frequent pollers (e.g. liveness probes) can reuse them
+keepalive = int(os.environ.get('KEEPALIVE', 5))
@@ -4,28 +4,34 @@ Test script for Flask Webhook API
 This script demonstrates how to test the webhook endpoints.
 """
 
+import hashlib
+import hmac
+import os
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
 
 
-def test_health_check(base_url):
+def test_health_check(session, base_url):
     """Test the health check endpoint"""
-    print("🔍 Testing health check endpoint...")
+    output = ["🔍 Testing health check endpoint..."]
     
     try:
-        response = requests.get(f"{base_url}/")
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {response.json()}")
-        return response.status_code == 200
+        response = session.get(f"{base_url}/")
+        output.append(f"Status Code: {response.status_code}")
+        output.append(f"Response: {response.json()}")
+        return response.status_code == 200, output
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        output.append(f"❌ Error: {e}")
+        return False, output
 
 
-def test_generic_webhook(base_url):
+def test_generic_webhook(session, base_url):
     """Test the generic webhook endpoint"""
-    print("\n🔍 Testing generic webhook endpoint...")
+    output = ["\n🔍 Testing generic webhook endpoint..."]
     
     test_payload = {
         "event": "test_event",
@@ -38,22 +44,22 @@ def test_generic_webhook(base_url):
     }
     
     try:
-        response = requests.post(
+        response = session.post(
             f"{base_url}/webhook",
             json=test_payload,
             headers={"Content-Type": "application/json"}
         )
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        return response.status_code == 200
+        output.append(f"Status Code: {response.status_code}")
+        output.append(f"Response: {json.dumps(response.json(), indent=2)}")
+        return response.status_code == 200, output
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        output.append(f"❌ Error: {e}")
+        return False, output
 
 
-def test_github_webhook(base_url):
+def test_github_webhook(session, base_url):
     """Test the GitHub webhook endpoint"""
-    print("\n🔍 Testing GitHub webhook endpoint...")
+    output = ["\n🔍 Testing GitHub webhook endpoint..."]
     
     github_payload = {
         "ref": "refs/heads/main",
@@ -82,39 +88,87 @@ def test_github_webhook(base_url):
         ]
     }
     
+    body = json.dumps(github_payload).encode()
+    headers = {
+        "Content-Type": "application/json",
+        "X-GitHub-Event": "push"
+    }
+    
+    # Sign the payload the way GitHub does if the server expects a signature
+    secret = os.environ.get("GITHUB_WEBHOOK_SECRET")
+    if secret:
+        digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        headers["X-Hub-Signature-256"] = f"sha256={digest}"
+    
     try:
-        response = requests.post(
+        response = session.post(
             f"{base_url}/webhook/github",
-            json=github_payload,
-            headers={
-                "Content-Type": "application/json",
-                "X-GitHub-Event": "push"
-            }
+            data=body,
+            headers=headers
         )
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {json.dumps(response.json(), indent=2)}")
-        return response.status_code == 200
+        output.append(f"Status Code: {response.status_code}")
+        output.append(f"Response: {json.dumps(response.json(), indent=2)}")
+        return response.status_code == 200, output
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        output.append(f"❌ Error: {e}")
+        return False, output
 
 
-def test_invalid_json(base_url):
+def test_invalid_json(session, base_url):
     """Test webhook with invalid JSON"""
-    print("\n🔍 Testing invalid JSON handling...")
+    output = ["\n🔍 Testing invalid JSON handling..."]
     
     try:
-        response = requests.post(
+        response = session.post(
             f"{base_url}/webhook",
             data="invalid json data",
             headers={"Content-Type": "application/json"}
         )
-        print(f"Status Code: {response.status_code}")
-        print(f"Response: {response.json()}")
-        return response.status_code == 400
+        output.append(f"Status Code: {response.status_code}")
+        output.append(f"Response: {response.json()}")
+        return response.status_code == 400, output
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        output.append(f"❌ Error: {e}")
+        return False, output
+
+
+def create_session(pool_size):
+    """
+    Create the Session shared by all test threads
+
+    Sharing is safe here: the tests only send requests and never change session
+    state (cookies, auth, headers), and the urllib3 connection pool underneath is
+    thread-safe. Sizing the pool to the worker count gives every thread its own
+    keep-alive connection instead of discarding extras.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def run_test(test, session, base_url):
+    """Run one (name, func) test on the shared keep-alive session
+
+    Each test returns (passed, output lines) so its output can be printed as one block.
+    """
+    test_name, test_func = test
+    result, output = test_func(session, base_url)
+    return test_name, result, output
+
+
+def wait_for_server(session, base_url, timeout=10):
+    """Poll the health check until the server answers or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if session.get(f"{base_url}/", timeout=1).status_code == 200:
+                return True
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.1)
+    return False
 
 
 def main():
@@ -125,9 +179,6 @@ def main():
     print(f"Testing against: {base_url}")
     print("=" * 50)
     
-    # Wait a moment for server to be ready
-    time.sleep(1)
-    
     tests = [
         ("Health Check", test_health_check),
         ("Generic Webhook", test_generic_webhook),
@@ -135,11 +186,22 @@ def main():
         ("Invalid JSON", test_invalid_json)
     ]
     
+    # One session for the readiness poll and every test, closed when done; the
+    # connection opened by the poll is reused by the first test to run
+    with create_session(len(tests)) as session:
+        if not wait_for_server(session, base_url):
+            print(f"❌ Server at {base_url} did not become ready")
+            return
+        
+        # The tests are independent, so run them concurrently; output is collected
+        # per test and printed in order
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            runs = list(executor.map(partial(run_test, session=session, base_url=base_url), tests))
+    
     results = []
-    for test_name, test_func in tests:
-        result = test_func(base_url)
+    for test_name, result, output in runs:
+        print("\n".join(output))
         results.append((test_name, result))
-        time.sleep(0.5)  # Small delay between tests
     
     print("\n" + "=" * 50)
     print("📊 Test Results:")